@@ -1,18 +1,52 @@
 import logging
 from abc import ABC, abstractmethod
-from typing import Any, Dict, List, Optional
+from typing import (Any, Awaitable, Callable, Dict, List, Optional, TypeVar,
+                    Union)
 
+from sqlalchemy import TextClause, text
 from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine
 
+from pipelus.db.resilience import (CircuitBreaker, ResilienceMetrics,
+                                   RetryPolicy, async_call_with_retry,
+                                   call_with_retry, is_disconnect_error,
+                                   is_not_applied_error)
+
+T = TypeVar('T')
+
+
+def _is_memory_database(engine) -> bool:
+    """Indica se o engine aponta para um banco SQLite em memória."""
+    url = engine.url
+    database = url.database or ''
+    return url.get_backend_name() == 'sqlite' and (
+        database in ('', ':memory:')
+        or ':memory:' in database
+        or url.query.get('mode') == 'memory'
+    )
+
 
 class SyncBaseConnection(ABC):
     """Classe abstrata para conexões de banco de dados."""
 
-    def __init__(self, connection_string: str) -> None:
-        """Inicializa a classe."""
+    def __init__(
+        self,
+        connection_string: str,
+        retry_policy: Optional[RetryPolicy] = None,
+        circuit_breaker: Optional[CircuitBreaker] = None,
+    ) -> None:
+        """Inicializa a classe.
+
+        Um mesmo `circuit_breaker` pode ser compartilhado entre conexões que
+        usam o mesmo banco.
+        """
         self.connection_string: str = connection_string
         self.engine = None
         self.connection = None
+        self.retry_policy: RetryPolicy = retry_policy or RetryPolicy()
+        self.circuit_breaker: CircuitBreaker = (
+            circuit_breaker or CircuitBreaker()
+        )
+        self.metrics: ResilienceMetrics = ResilienceMetrics()
 
     def __enter__(self):
         """Abre a conexão com o banco de dados."""
@@ -33,6 +67,73 @@ class SyncBaseConnection(ABC):
             except Exception as e:
                 logging.error(f'Erro ao fechar conexão: {str(e)}')
 
+    def _prepare_retry(self, error: Exception) -> None:
+        """Prepara a conexão atual para uma nova tentativa de leitura.
+
+        Só troca a conexão por uma nova do pool quando ela foi perdida; um
+        banco SQLite em memória seria apagado ao descartar a conexão.
+        """
+        if is_disconnect_error(error) and not _is_memory_database(
+            self.engine
+        ):
+            try:
+                self.connection.invalidate()
+                self.connection.close()
+            except Exception as e:
+                logging.debug(f'Erro ao descartar conexão: {str(e)}')
+            self.connection = self.engine.connect()
+            logging.info('Conexão restabelecida.')
+            return
+
+        try:
+            self.connection.rollback()
+        except Exception as e:
+            logging.debug(f'Erro ao realizar rollback: {str(e)}')
+
+    def _execute_with_retry(
+        self,
+        operation: Callable[[], T],
+        reconnect: bool = False,
+        retry_if: Optional[Callable[[Exception], bool]] = None,
+    ) -> T:
+        """Executa a operação com retry, backoff e circuit breaker."""
+        return call_with_retry(
+            operation,
+            self.retry_policy,
+            self.circuit_breaker,
+            self.metrics,
+            on_retry=self._prepare_retry if reconnect else None,
+            retry_if=retry_if,
+        )
+
+    def _execute_modify_with_retry(
+        self, query: Union[str, TextClause], idempotent: bool
+    ) -> None:
+        """Executa a modificação em uma transação própria do pool.
+
+        Repete falhas ocorridas antes do envio do comando e erros que garantem
+        que nada foi aplicado (deadlock, serialização, banco bloqueado). Uma
+        queda de conexão após o envio só é repetida com `idempotent`, pois o
+        lote pode já ter sido confirmado pelo servidor.
+        """
+        statement = query if isinstance(query, TextClause) else text(query)
+        sent = False
+
+        def _modify() -> None:
+            nonlocal sent
+            sent = False
+            with self.engine.connect() as conn:
+                sent = True
+                with conn.begin():
+                    conn.execute(statement)
+
+        self._execute_with_retry(
+            _modify,
+            retry_if=lambda e: (
+                idempotent or not sent or is_not_applied_error(e)
+            ),
+        )
+
 
 class SyncBaseConnectionWithExecute(SyncBaseConnection):
     """Extensão da SyncBaseConnection que define os métodos abstratos."""
@@ -43,7 +144,7 @@ class SyncBaseConnectionWithExecute(SyncBaseConnection):
         pass
 
     @abstractmethod
-    def execute_modify(self, query: str) -> bool:
+    def execute_modify(self, query: str, idempotent: bool = False) -> bool:
         """Executa uma query de modificação (INSERT, UPDATE, DELETE)."""
         pass
 
@@ -51,11 +152,25 @@ class SyncBaseConnectionWithExecute(SyncBaseConnection):
 class AsyncBaseConnection(ABC):
     """Classe abstrata para conexões assíncronas de banco de dados."""
 
-    def __init__(self, connection_string: str) -> None:
-        """Inicializa a classe."""
+    def __init__(
+        self,
+        connection_string: str,
+        retry_policy: Optional[RetryPolicy] = None,
+        circuit_breaker: Optional[CircuitBreaker] = None,
+    ) -> None:
+        """Inicializa a classe.
+
+        Um mesmo `circuit_breaker` pode ser compartilhado entre conexões que
+        usam o mesmo banco.
+        """
         self.connection_string: str = connection_string
         self.engine: Optional[AsyncEngine] = None
         self.connection: Optional[AsyncConnection] = None
+        self.retry_policy: RetryPolicy = retry_policy or RetryPolicy()
+        self.circuit_breaker: CircuitBreaker = (
+            circuit_breaker or CircuitBreaker()
+        )
+        self.metrics: ResilienceMetrics = ResilienceMetrics()
 
     async def __aenter__(self):
         """Abre a conexão com o banco de dados."""
@@ -78,12 +193,81 @@ class AsyncBaseConnection(ABC):
             except Exception as e:
                 logging.error(f'Erro ao fechar conexão assíncrona: {str(e)}')
 
+    async def _prepare_retry(self, error: Exception) -> None:
+        """Prepara a conexão atual para uma nova tentativa de leitura.
+
+        Só troca a conexão por uma nova do pool quando ela foi perdida; um
+        banco SQLite em memória seria apagado ao descartar a conexão.
+        """
+        if is_disconnect_error(error) and not _is_memory_database(
+            self.engine
+        ):
+            try:
+                await self.connection.invalidate()
+                await self.connection.close()
+            except Exception as e:
+                logging.debug(f'Erro ao descartar conexão: {str(e)}')
+            self.connection = await self.engine.connect()
+            logging.info('Conexão assíncrona restabelecida.')
+            return
+
+        try:
+            await self.connection.rollback()
+        except Exception as e:
+            logging.debug(f'Erro ao realizar rollback: {str(e)}')
+
+    async def _execute_with_retry(
+        self,
+        operation: Callable[[], Awaitable[T]],
+        reconnect: bool = False,
+        retry_if: Optional[Callable[[Exception], bool]] = None,
+    ) -> T:
+        """Executa a operação assíncrona com retry, backoff e circuit breaker."""
+        return await async_call_with_retry(
+            operation,
+            self.retry_policy,
+            self.circuit_breaker,
+            self.metrics,
+            on_retry=self._prepare_retry if reconnect else None,
+            retry_if=retry_if,
+        )
+
+    async def _execute_modify_with_retry(
+        self, query: Union[str, TextClause], idempotent: bool
+    ) -> None:
+        """Executa a modificação em uma transação própria do pool.
+
+        Repete falhas ocorridas antes do envio do comando e erros que garantem
+        que nada foi aplicado (deadlock, serialização, banco bloqueado). Uma
+        queda de conexão após o envio só é repetida com `idempotent`, pois o
+        lote pode já ter sido confirmado pelo servidor.
+        """
+        statement = query if isinstance(query, TextClause) else text(query)
+        sent = False
+
+        async def _modify() -> None:
+            nonlocal sent
+            sent = False
+            async with self.engine.connect() as conn:
+                sent = True
+                async with conn.begin():
+                    await conn.execute(statement)
+
+        await self._execute_with_retry(
+            _modify,
+            retry_if=lambda e: (
+                idempotent or not sent or is_not_applied_error(e)
+            ),
+        )
+
     @abstractmethod
     async def execute_query(self, query: str) -> List[Dict[str, Any]]:
         """Executa uma query de leitura (SELECT) e retorna os resultados."""
         pass
 
     @abstractmethod
-    async def execute_modify(self, query: str) -> List[Dict[str, Any]]:
+    async def execute_modify(
+        self, query: str, idempotent: bool = False
+    ) -> bool:
         """Executa uma query de modificação (INSERT, UPDATE, DELETE)."""
         pass
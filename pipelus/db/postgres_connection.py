@@ -1,7 +1,7 @@
 import logging
 from typing import Any, Dict, List, Optional, Union
 
-from sqlalchemy import TextClause, create_engine, text
+from sqlalchemy import create_engine, text
 from sqlalchemy.engine import Connection, Engine
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.ext.asyncio import (AsyncConnection, AsyncEngine,
@@ -9,45 +9,60 @@ from sqlalchemy.ext.asyncio import (AsyncConnection, AsyncEngine,
 
 from pipelus.db.base_connection import (AsyncBaseConnection,
                                         SyncBaseConnectionWithExecute)
+from pipelus.db.resilience import (CircuitBreaker, CircuitBreakerOpenError,
+                                   RetryPolicy)
 
 
 class PostgresConnection(SyncBaseConnectionWithExecute):
     """Gerencia a conexão com um banco PostgreSQL."""
 
-    def __init__(self, connection_string: str) -> None:
+    def __init__(
+        self,
+        connection_string: str,
+        retry_policy: Optional[RetryPolicy] = None,
+        circuit_breaker: Optional[CircuitBreaker] = None,
+    ) -> None:
         """Inicializa a classe PostgresConnection."""
-        super().__init__(connection_string)
+        super().__init__(connection_string, retry_policy, circuit_breaker)
         self.engine: Optional[Engine] = create_engine(
-            self._connection_string, echo=False, future=True
+            self.connection_string,
+            echo=False,
+            future=True,
+            pool_pre_ping=True,
         )
         self.connection: Optional[Connection] = None
 
     def execute_query(self, query: str) -> List[Dict[str, Any]]:
         """Executa uma query de leitura (SELECT)."""
-        try:
+        def _fetch() -> List[Dict[str, Any]]:
             result = self.connection.execute(text(query))
             columns = result.keys()
-            data = [dict(zip(columns, row)) for row in result.fetchall()]
+            return [dict(zip(columns, row)) for row in result.fetchall()]
+
+        try:
+            data = self._execute_with_retry(_fetch, reconnect=True)
             logging.info(
                 f'Query executada com sucesso. Linhas retornadas: {len(data)}'
             )
             return data
-        except SQLAlchemyError as e:
+        except (SQLAlchemyError, CircuitBreakerOpenError) as e:
             logging.error(f'Erro ao executar query: {str(e)}')
             return []
 
-    def execute_modify(self, query: str) -> bool:
-        """Executa uma query de modificação (INSERT, UPDATE, DELETE)."""
+    def execute_modify(self, query: str, idempotent: bool = False) -> bool:
+        """Executa uma query de modificação (INSERT, UPDATE, DELETE).
+
+        Deadlocks, falhas de serialização e banco bloqueado são sempre
+        repetidos, pois o comando não foi aplicado. Uma queda de conexão após
+        o envio só é repetida com `idempotent=True`, que deve ser usado apenas
+        para comandos que podem ser reexecutados sem duplicar dados.
+        """
         try:
             logging.debug('Executando modificação.')
-            with self.engine.begin() as conn:
-                if isinstance(query, TextClause):
-                    conn.execute(query)
-                else:
-                    conn.execute(text(query))
+            self._execute_modify_with_retry(query, idempotent)
             logging.info('Query de modificação executada com sucesso.')
             return True
-        except SQLAlchemyError as e:
+        except (SQLAlchemyError, CircuitBreakerOpenError) as e:
             logging.error(
                 f'Erro ao executar modificação. Rollback realizado: {str(e)}'
             )
@@ -57,11 +72,19 @@ class PostgresConnection(SyncBaseConnectionWithExecute):
 class AsyncPostgresConnection(AsyncBaseConnection):
     """Gerencia a conexão assíncrona com um banco PostgreSQL."""
 
-    def __init__(self, connection_string: str) -> None:
+    def __init__(
+        self,
+        connection_string: str,
+        retry_policy: Optional[RetryPolicy] = None,
+        circuit_breaker: Optional[CircuitBreaker] = None,
+    ) -> None:
         """Inicializa a classe AsyncPostgresConnection."""
-        super().__init__(connection_string)
+        super().__init__(connection_string, retry_policy, circuit_breaker)
         self.engine: AsyncEngine = create_async_engine(
-            self.connection_string, echo=False, future=True
+            self.connection_string,
+            echo=False,
+            future=True,
+            pool_pre_ping=True,
         )
 
     async def execute_query(self, query: str) -> List[Dict[str, Any]]:
@@ -69,34 +92,41 @@ class AsyncPostgresConnection(AsyncBaseConnection):
         if not self.connection:
             logging.error("Conexão não está aberta. Use 'async with'.")
 
-        try:
-            logging.debug('Executando query assíncrona no PostgreSQL.')
+        async def _fetch() -> List[Dict[str, Any]]:
             result = await self.connection.execute(text(query))
             columns = result.keys()
-            data = [dict(zip(columns, row)) async for row in result]
+            return [dict(zip(columns, row)) async for row in result]
+
+        try:
+            logging.debug('Executando query assíncrona no PostgreSQL.')
+            data = await self._execute_with_retry(_fetch, reconnect=True)
             logging.info(
                 f'Query executada com sucesso. Linhas retornadas: {len(data)}'
             )
             return data
-        except SQLAlchemyError as e:
+        except (SQLAlchemyError, CircuitBreakerOpenError) as e:
             logging.error(f'Erro ao executar query: {str(e)}')
             return []
 
-    async def execute_modify(self, query: str) -> bool:
-        """Executa uma query de modificação (INSERT, UPDATE, DELETE)."""
+    async def execute_modify(
+        self, query: str, idempotent: bool = False
+    ) -> bool:
+        """Executa uma query de modificação (INSERT, UPDATE, DELETE).
+
+        Deadlocks, falhas de serialização e banco bloqueado são sempre
+        repetidos, pois o comando não foi aplicado. Uma queda de conexão após
+        o envio só é repetida com `idempotent=True`, que deve ser usado apenas
+        para comandos que podem ser reexecutados sem duplicar dados.
+        """
         if not self.engine:
             logging.error("Conexão não está aberta. Use 'async with'.")
 
         try:
             logging.debug('Executando modificação assíncrona no PostgreSQL.')
-            async with self.engine.begin() as conn:
-                if isinstance(query, TextClause):
-                    await conn.execute(query)
-                else:
-                    await conn.execute(text(query))
+            await self._execute_modify_with_retry(query, idempotent)
             logging.info('Query de modificação executada com sucesso.')
             return True
-        except SQLAlchemyError as e:
+        except (SQLAlchemyError, CircuitBreakerOpenError) as e:
             logging.error(
                 f'Erro ao executar modificação. Rollback realizado: {str(e)}'
             )
@@ -0,0 +1,319 @@
+import asyncio
+import logging
+import random
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Optional, TypeVar
+
+from sqlalchemy.exc import DBAPIError, DisconnectionError
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+
+T = TypeVar('T')
+
+# SQLSTATE do PostgreSQL: classe 08 (conexão), falhas de serialização e
+# deadlock, e desligamento/reinício do servidor.
+_PG_TRANSIENT_SQLSTATE_PREFIXES = ('08',)
+_PG_TRANSIENT_SQLSTATES = {'40001', '40P01', '57P01', '57P02', '57P03'}
+
+# Falhas de serialização e deadlock: o servidor sempre desfaz a transação.
+_PG_ROLLED_BACK_SQLSTATES = {'40001', '40P01'}
+
+# Códigos primários do SQLite: SQLITE_BUSY e SQLITE_LOCKED.
+_SQLITE_TRANSIENT_CODES = {5, 6}
+_SQLITE_LOCKED_MESSAGES = ('database is locked', 'database table is locked')
+
+# Usadas apenas quando o driver não informa código de erro, como nas falhas
+# de conexão do psycopg2 ou em exceções do sqlite3 sem `sqlite_errorcode`.
+_TRANSIENT_MESSAGES = _SQLITE_LOCKED_MESSAGES + (
+    'could not connect to server',
+    'connection refused',
+    'connection timed out',
+    'timeout expired',
+    'the database system is starting up',
+    'the database system is shutting down',
+    'server closed the connection unexpectedly',
+)
+
+
+class CircuitBreakerOpenError(Exception):
+    """Erro lançado quando o circuit breaker rejeita uma operação."""
+
+
+def is_disconnect_error(error: BaseException) -> bool:
+    """Indica se o erro corresponde à perda da conexão com o banco."""
+    if isinstance(
+        error, (DisconnectionError, PoolTimeoutError, ConnectionError)
+    ):
+        return True
+    return isinstance(error, DBAPIError) and error.connection_invalidated
+
+
+def _get_sqlstate(orig: BaseException) -> Optional[str]:
+    """Recupera o SQLSTATE de um erro do driver PostgreSQL, se houver."""
+    return getattr(orig, 'pgcode', None) or getattr(orig, 'sqlstate', None)
+
+
+def _is_transient_orig(orig: BaseException) -> bool:
+    """Classifica o erro original do driver pelo código ou pela mensagem."""
+    sqlstate = _get_sqlstate(orig)
+    if sqlstate:
+        return (
+            sqlstate.startswith(_PG_TRANSIENT_SQLSTATE_PREFIXES)
+            or sqlstate in _PG_TRANSIENT_SQLSTATES
+        )
+    code = getattr(orig, 'sqlite_errorcode', None)
+    if code is not None:
+        return code & 0xFF in _SQLITE_TRANSIENT_CODES
+    message = str(orig).lower()
+    return any(msg in message for msg in _TRANSIENT_MESSAGES)
+
+
+def is_transient_error(error: BaseException) -> bool:
+    """Indica se o erro é transitório e, portanto, pode ser repetido."""
+    if is_disconnect_error(error):
+        return True
+    if not isinstance(error, DBAPIError) or error.orig is None:
+        return False
+    return _is_transient_orig(error.orig)
+
+
+def is_not_applied_error(error: BaseException) -> bool:
+    """Indica se o erro garante que o comando não foi aplicado no banco.
+
+    Vale para deadlock e falha de serialização no PostgreSQL e para
+    SQLITE_BUSY/SQLITE_LOCKED, em que a transação é desfeita.
+    """
+    if not isinstance(error, DBAPIError) or error.orig is None:
+        return False
+    if error.connection_invalidated:
+        return False
+    sqlstate = _get_sqlstate(error.orig)
+    if sqlstate:
+        return sqlstate in _PG_ROLLED_BACK_SQLSTATES
+    code = getattr(error.orig, 'sqlite_errorcode', None)
+    if code is not None:
+        return code & 0xFF in _SQLITE_TRANSIENT_CODES
+    message = str(error.orig).lower()
+    return any(msg in message for msg in _SQLITE_LOCKED_MESSAGES)
+
+
+@dataclass
+class RetryPolicy:
+    """Configuração de retry com backoff exponencial e jitter."""
+
+    max_attempts: int = 3
+    base_delay: float = 0.5
+    max_delay: float = 10.0
+
+    def get_delay(self, attempt: int) -> float:
+        """Calcula o tempo de espera (full jitter) antes da próxima tentativa."""
+        ceiling = min(self.max_delay, self.base_delay * (2 ** (attempt - 1)))
+        return random.uniform(0, ceiling)
+
+
+@dataclass
+class ResilienceMetrics:
+    """Contadores das operações executadas com retry e circuit breaker."""
+
+    attempts: int = 0
+    successes: int = 0
+    failures: int = 0
+    retries: int = 0
+    transient_errors: int = 0
+    permanent_errors: int = 0
+    rejected_by_circuit: int = 0
+
+    def as_dict(self) -> Dict[str, int]:
+        """Retorna as métricas em formato de dicionário."""
+        return dict(self.__dict__)
+
+
+class CircuitBreaker:
+    """Circuit breaker que interrompe chamadas após falhas transitórias seguidas."""
+
+    def __init__(
+        self, failure_threshold: int = 5, reset_timeout: float = 30.0
+    ) -> None:
+        """Inicializa a classe CircuitBreaker."""
+        self.failure_threshold: int = failure_threshold
+        self.reset_timeout: float = reset_timeout
+        self.state: str = 'closed'
+        self.failure_count: int = 0
+        self.opened_at: Optional[float] = None
+        self._probe_in_flight: bool = False
+        self._lock = threading.Lock()
+
+    def allow_request(self) -> bool:
+        """Indica se uma nova chamada pode ser feita ao banco."""
+        with self._lock:
+            if self.state == 'closed':
+                return True
+            if self.state == 'open':
+                if time.monotonic() - self.opened_at < self.reset_timeout:
+                    return False
+                self.state = 'half_open'
+                logging.info('Circuit breaker em half-open. Testando conexão.')
+            if self._probe_in_flight:
+                return False
+            self._probe_in_flight = True
+            return True
+
+    def record_success(self) -> None:
+        """Registra uma chamada bem-sucedida e fecha o circuito."""
+        with self._lock:
+            if self.state != 'closed':
+                logging.info('Circuit breaker fechado.')
+            self.state = 'closed'
+            self.failure_count = 0
+            self.opened_at = None
+            self._probe_in_flight = False
+
+    def record_failure(self) -> None:
+        """Registra uma falha transitória e abre o circuito se necessário."""
+        with self._lock:
+            self.failure_count += 1
+            self._probe_in_flight = False
+            if (
+                self.state == 'half_open'
+                or self.failure_count >= self.failure_threshold
+            ):
+                if self.state != 'open':
+                    logging.warning(
+                        f'Circuit breaker aberto após {self.failure_count} falhas.'
+                    )
+                self.state = 'open'
+                self.opened_at = time.monotonic()
+
+    def release_probe(self) -> None:
+        """Libera a chamada de teste do half-open sem contar falha."""
+        with self._lock:
+            self._probe_in_flight = False
+
+
+def _handle_error(
+    error: Exception,
+    attempt: int,
+    policy: RetryPolicy,
+    breaker: CircuitBreaker,
+    metrics: ResilienceMetrics,
+    retry_if: Optional[Callable[[Exception], bool]],
+) -> bool:
+    """Contabiliza o erro e indica se a operação deve ser repetida."""
+    if not is_transient_error(error):
+        metrics.permanent_errors += 1
+        metrics.failures += 1
+        breaker.release_probe()
+        logging.error(f'Erro permanente, sem retry: {str(error)}')
+        return False
+
+    metrics.transient_errors += 1
+    breaker.record_failure()
+    if (
+        attempt >= policy.max_attempts
+        or breaker.state == 'open'
+        or (retry_if is not None and not retry_if(error))
+    ):
+        metrics.failures += 1
+        logging.error(
+            f'Erro transitório após {attempt} tentativa(s): {str(error)}'
+        )
+        return False
+
+    metrics.retries += 1
+    logging.warning(
+        f'Erro transitório na tentativa {attempt}/{policy.max_attempts}: '
+        f'{str(error)}'
+    )
+    return True
+
+
+def _check_circuit(
+    breaker: CircuitBreaker, metrics: ResilienceMetrics
+) -> None:
+    """Lança CircuitBreakerOpenError se o circuito estiver aberto."""
+    if not breaker.allow_request():
+        metrics.rejected_by_circuit += 1
+        raise CircuitBreakerOpenError(
+            'Circuit breaker aberto. Operação rejeitada.'
+        )
+
+
+def call_with_retry(
+    operation: Callable[[], T],
+    policy: RetryPolicy,
+    breaker: CircuitBreaker,
+    metrics: ResilienceMetrics,
+    on_retry: Optional[Callable[[Exception], Any]] = None,
+    retry_if: Optional[Callable[[Exception], bool]] = None,
+) -> T:
+    """Executa a operação com retry, backoff e circuit breaker.
+
+    `on_retry` recebe o último erro antes de cada nova tentativa e
+    `retry_if` restringe quais erros transitórios podem ser repetidos.
+    """
+    attempt = 0
+    last_error: Optional[Exception] = None
+    while True:
+        _check_circuit(breaker, metrics)
+        attempt += 1
+        metrics.attempts += 1
+        try:
+            if last_error is not None and on_retry:
+                on_retry(last_error)
+            result = operation()
+        except Exception as e:
+            if not _handle_error(
+                e, attempt, policy, breaker, metrics, retry_if
+            ):
+                raise
+            last_error = e
+            time.sleep(policy.get_delay(attempt))
+            continue
+        except BaseException:
+            # Cancelamento ou interrupção não pode prender o half-open.
+            breaker.release_probe()
+            raise
+        breaker.record_success()
+        metrics.successes += 1
+        return result
+
+
+async def async_call_with_retry(
+    operation: Callable[[], Awaitable[T]],
+    policy: RetryPolicy,
+    breaker: CircuitBreaker,
+    metrics: ResilienceMetrics,
+    on_retry: Optional[Callable[[Exception], Awaitable[Any]]] = None,
+    retry_if: Optional[Callable[[Exception], bool]] = None,
+) -> T:
+    """Executa a operação assíncrona com retry, backoff e circuit breaker.
+
+    `on_retry` recebe o último erro antes de cada nova tentativa e
+    `retry_if` restringe quais erros transitórios podem ser repetidos.
+    """
+    attempt = 0
+    last_error: Optional[Exception] = None
+    while True:
+        _check_circuit(breaker, metrics)
+        attempt += 1
+        metrics.attempts += 1
+        try:
+            if last_error is not None and on_retry:
+                await on_retry(last_error)
+            result = await operation()
+        except Exception as e:
+            if not _handle_error(
+                e, attempt, policy, breaker, metrics, retry_if
+            ):
+                raise
+            last_error = e
+            await asyncio.sleep(policy.get_delay(attempt))
+            continue
+        except BaseException:
+            # Cancelamento ou interrupção não pode prender o half-open.
+            breaker.release_probe()
+            raise
+        breaker.record_success()
+        metrics.successes += 1
+        return result
@@ -1,7 +1,7 @@
 import logging
 from typing import Any, Dict, List, Optional, Union
 
-from sqlalchemy import TextClause, create_engine, text
+from sqlalchemy import create_engine, text
 from sqlalchemy.engine import Connection, Engine, Result
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.ext.asyncio import (AsyncConnection, AsyncEngine,
@@ -9,14 +9,21 @@ from sqlalchemy.ext.asyncio import (AsyncConnection, AsyncEngine,
 
 from pipelus.db.base_connection import (AsyncBaseConnection,
                                         SyncBaseConnectionWithExecute)
+from pipelus.db.resilience import (CircuitBreaker, CircuitBreakerOpenError,
+                                   RetryPolicy)
 
 
 class SyncSQLiteConnection(SyncBaseConnectionWithExecute):
     """Gerencia a conexão síncrona com um banco de dados SQLite."""
 
-    def __init__(self, connection_string: str) -> None:
+    def __init__(
+        self,
+        connection_string: str,
+        retry_policy: Optional[RetryPolicy] = None,
+        circuit_breaker: Optional[CircuitBreaker] = None,
+    ) -> None:
         """Inicializa a classe SyncSQLiteConnection."""
-        super().__init__(connection_string)
+        super().__init__(connection_string, retry_policy, circuit_breaker)
         self.engine: Engine = create_engine(
             self.connection_string, echo=False, future=True
         )
@@ -26,36 +33,41 @@ class SyncSQLiteConnection(SyncBaseConnectionWithExecute):
         if not self.connection:
             logging.error("Conexão não está aberta. Use 'with'.")
 
-        try:
-            logging.debug('Executando query no SQLite.')
+        def _fetch() -> List[Dict[str, Any]]:
             result: Result = self.connection.execute(text(query))
             columns = result.keys()
-            data = [dict(zip(columns, row)) for row in result.fetchall()]
+            return [dict(zip(columns, row)) for row in result.fetchall()]
+
+        try:
+            logging.debug('Executando query no SQLite.')
+            data = self._execute_with_retry(_fetch, reconnect=True)
             logging.info(
                 f'Query executada com sucesso. Linhas retornadas: {len(data)}'
             )
             return data
-        except SQLAlchemyError as e:
+        except (SQLAlchemyError, CircuitBreakerOpenError) as e:
             logging.error(f'Erro ao executar query no SQLite: {str(e)}')
             return []
 
-    def execute_modify(self, query: str) -> bool:
-        """Executa uma query de modificação (INSERT, UPDATE, DELETE) no SQLite."""
+    def execute_modify(self, query: str, idempotent: bool = False) -> bool:
+        """Executa uma query de modificação (INSERT, UPDATE, DELETE) no SQLite.
+
+        Deadlocks, falhas de serialização e banco bloqueado são sempre
+        repetidos, pois o comando não foi aplicado. Uma queda de conexão após
+        o envio só é repetida com `idempotent=True`, que deve ser usado apenas
+        para comandos que podem ser reexecutados sem duplicar dados.
+        """
         if not self.engine:
             logging.error("Conexão não está aberta. Use 'with'.")
 
         try:
             logging.debug('Executando modificação no SQLite.')
-            with self.engine.begin() as conn:
-                if isinstance(query, TextClause):
-                    conn.execute(query)
-                else:
-                    conn.execute(text(query))
+            self._execute_modify_with_retry(query, idempotent)
             logging.info(
                 'Query de modificação executada com sucesso no SQLite.'
             )
             return True
-        except SQLAlchemyError as e:
+        except (SQLAlchemyError, CircuitBreakerOpenError) as e:
             logging.error(
                 f'Erro ao executar modificação no SQLite. Rollback realizado: {str(e)}'
             )
@@ -65,9 +77,14 @@ class SyncSQLiteConnection(SyncBaseConnectionWithExecute):
 class AsyncSQLiteConnection(AsyncBaseConnection):
     """Gerencia a conexão assíncrona com um banco de dados SQLite."""
 
-    def __init__(self, connection_string: str) -> None:
+    def __init__(
+        self,
+        connection_string: str,
+        retry_policy: Optional[RetryPolicy] = None,
+        circuit_breaker: Optional[CircuitBreaker] = None,
+    ) -> None:
         """Inicializa a classe AsyncSQLiteConnection."""
-        super().__init__(connection_string)
+        super().__init__(connection_string, retry_policy, circuit_breaker)
         self.engine: AsyncEngine = create_async_engine(
             self.connection_string, echo=False, future=True
         )
@@ -77,38 +94,45 @@ class AsyncSQLiteConnection(AsyncBaseConnection):
         if not self.connection:
             logging.error("Conexão não está aberta. Use 'async with'.")
 
-        try:
-            logging.debug('Executando query assíncrona no SQLite.')
+        async def _fetch() -> List[Dict[str, Any]]:
             result = await self.connection.execute(text(query))
             columns = result.keys()
-            data = [dict(zip(columns, row)) for row in result.fetchall()]
+            return [dict(zip(columns, row)) for row in result.fetchall()]
+
+        try:
+            logging.debug('Executando query assíncrona no SQLite.')
+            data = await self._execute_with_retry(_fetch, reconnect=True)
             logging.info(
                 f'Query executada com sucesso. Linhas retornadas: {len(data)}'
             )
             return data
-        except SQLAlchemyError as e:
+        except (SQLAlchemyError, CircuitBreakerOpenError) as e:
             logging.error(
                 f'Erro ao executar query assíncrona no SQLite: {str(e)}'
             )
             return []
 
-    async def execute_modify(self, query: str) -> bool:
-        """Executa uma query de modificação (INSERT, UPDATE, DELETE) no SQLite assíncrono."""
+    async def execute_modify(
+        self, query: str, idempotent: bool = False
+    ) -> bool:
+        """Executa uma query de modificação (INSERT, UPDATE, DELETE) no SQLite assíncrono.
+
+        Deadlocks, falhas de serialização e banco bloqueado são sempre
+        repetidos, pois o comando não foi aplicado. Uma queda de conexão após
+        o envio só é repetida com `idempotent=True`, que deve ser usado apenas
+        para comandos que podem ser reexecutados sem duplicar dados.
+        """
         if not self.engine:
             logging.error('Engine não inicializado.')
 
         try:
             logging.debug('Executando modificação assíncrona no SQLite.')
-            async with self.engine.begin() as conn:
-                if isinstance(query, TextClause):
-                    await conn.execute(query)
-                else:
-                    await conn.execute(text(query))
+            await self._execute_modify_with_retry(query, idempotent)
             logging.info(
                 'Query de modificação executada com sucesso no SQLite.'
             )
             return True
-        except SQLAlchemyError as e:
+        except (SQLAlchemyError, CircuitBreakerOpenError) as e:
             logging.error(
                 f'Erro ao executar modificação assíncrona no SQLite. Rollback realizado: {str(e)}'
             )
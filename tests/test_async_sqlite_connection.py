@@ -0,0 +1,99 @@
+import importlib.util
+import os
+import sqlite3
+import tempfile
+import unittest
+from unittest import mock
+
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from pipelus.db.resilience import RetryPolicy
+from pipelus.db.sqlite_connection import AsyncSQLiteConnection
+
+
+def _locked_error() -> OperationalError:
+    return OperationalError(
+        'INSERT', {}, sqlite3.OperationalError('database is locked')
+    )
+
+
+def _invalidated_error() -> OperationalError:
+    return OperationalError(
+        'SELECT',
+        {},
+        sqlite3.OperationalError('disk I/O error'),
+        connection_invalidated=True,
+    )
+
+
+def _fail_first(method, error: Exception):
+    """Envolve a corrotina para lançar `error` apenas na primeira chamada."""
+
+    async def wrapper(self, *args, **kwargs):
+        wrapper.calls += 1
+        if wrapper.calls == 1:
+            raise error
+        return await method(self, *args, **kwargs)
+
+    wrapper.calls = 0
+    return wrapper
+
+
+@unittest.skipUnless(
+    importlib.util.find_spec('aiosqlite'), 'aiosqlite não instalado'
+)
+class TestAsyncSQLiteConnection(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        path = os.path.join(self.tmp_dir.name, 'test.db')
+        self.db = AsyncSQLiteConnection(
+            f'sqlite+aiosqlite:///{path}',
+            retry_policy=RetryPolicy(max_attempts=3, base_delay=0),
+        )
+        await self.db.__aenter__()
+        await self.db.execute_modify('CREATE TABLE t (a INTEGER)')
+        await self.db.execute_modify('INSERT INTO t VALUES (1)')
+
+    async def asyncTearDown(self):
+        await self.db.__aexit__(None, None, None)
+        await self.db.engine.dispose()
+        self.tmp_dir.cleanup()
+
+    async def test_query_reconnects_after_disconnect(self):
+        old_connection = self.db.connection
+        execute = _fail_first(AsyncConnection.execute, _invalidated_error())
+        with mock.patch.object(AsyncConnection, 'execute', execute):
+            data = await self.db.execute_query('SELECT a FROM t')
+
+        self.assertEqual(data, [{'a': 1}])
+        self.assertEqual(execute.calls, 2)
+        self.assertIsNot(self.db.connection, old_connection)
+        self.assertEqual(self.db.metrics.retries, 1)
+
+    async def test_locked_modify_is_retried(self):
+        execute = _fail_first(AsyncConnection.execute, _locked_error())
+        with mock.patch.object(AsyncConnection, 'execute', execute):
+            result = await self.db.execute_modify('INSERT INTO t VALUES (2)')
+
+        self.assertTrue(result)
+        self.assertEqual(execute.calls, 2)
+        self.assertEqual(
+            await self.db.execute_query('SELECT a FROM t ORDER BY a'),
+            [{'a': 1}, {'a': 2}],
+        )
+
+    async def test_disconnect_after_send_is_not_retried(self):
+        execute = _fail_first(AsyncConnection.execute, _invalidated_error())
+        with mock.patch.object(AsyncConnection, 'execute', execute):
+            result = await self.db.execute_modify('INSERT INTO t VALUES (2)')
+
+        self.assertFalse(result)
+        self.assertEqual(execute.calls, 1)
+        self.assertEqual(
+            await self.db.execute_query('SELECT a FROM t'), [{'a': 1}]
+        )
+
+
+if __name__ == '__main__':
+    unittest.main()
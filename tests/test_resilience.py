@@ -0,0 +1,265 @@
+import asyncio
+import sqlite3
+import time
+import unittest
+
+from sqlalchemy.exc import OperationalError, ProgrammingError
+
+from pipelus.db.resilience import (CircuitBreaker, CircuitBreakerOpenError,
+                                   ResilienceMetrics, RetryPolicy,
+                                   async_call_with_retry, call_with_retry,
+                                   is_not_applied_error, is_transient_error)
+
+
+class _PgError(Exception):
+    """Simula um erro do psycopg2 com SQLSTATE."""
+
+    def __init__(self, pgcode: str) -> None:
+        super().__init__(pgcode)
+        self.pgcode = pgcode
+
+
+def _sqlite_error(message: str) -> OperationalError:
+    return OperationalError('SELECT 1', {}, sqlite3.OperationalError(message))
+
+
+def _pg_error(pgcode: str) -> OperationalError:
+    return OperationalError('SELECT 1', {}, _PgError(pgcode))
+
+
+class _FlakyOperation:
+    """Operação que falha com os erros informados antes de retornar 'ok'."""
+
+    def __init__(self, *errors: Exception) -> None:
+        self.errors = list(errors)
+        self.calls = 0
+
+    def __call__(self) -> str:
+        self.calls += 1
+        if self.errors:
+            raise self.errors.pop(0)
+        return 'ok'
+
+
+class TestIsTransientError(unittest.TestCase):
+    def test_postgres_sqlstates(self):
+        for code in ('08006', '08001', '40001', '40P01', '57P01', '57P03'):
+            self.assertTrue(is_transient_error(_pg_error(code)), code)
+        for code in ('42601', '42P01', '28P01', '3D000', '23505'):
+            self.assertFalse(is_transient_error(_pg_error(code)), code)
+
+    def test_sqlite_errors(self):
+        self.assertTrue(is_transient_error(_sqlite_error('database is locked')))
+        self.assertFalse(
+            is_transient_error(_sqlite_error('near "SELCT": syntax error'))
+        )
+        self.assertFalse(is_transient_error(_sqlite_error('no such table: t')))
+
+    def test_invalidated_connection(self):
+        error = OperationalError(
+            'SELECT 1',
+            {},
+            sqlite3.OperationalError('disk I/O error'),
+            connection_invalidated=True,
+        )
+        self.assertTrue(is_transient_error(error))
+
+    def test_non_database_error(self):
+        self.assertFalse(is_transient_error(ValueError('x')))
+
+
+class TestIsNotAppliedError(unittest.TestCase):
+    def test_rolled_back_errors(self):
+        self.assertTrue(is_not_applied_error(_pg_error('40001')))
+        self.assertTrue(is_not_applied_error(_pg_error('40P01')))
+        self.assertTrue(
+            is_not_applied_error(_sqlite_error('database is locked'))
+        )
+
+    def test_unknown_outcome_errors(self):
+        self.assertFalse(is_not_applied_error(_pg_error('08006')))
+        self.assertFalse(is_not_applied_error(_pg_error('57P01')))
+        error = OperationalError(
+            'COMMIT',
+            {},
+            sqlite3.OperationalError('database is locked'),
+            connection_invalidated=True,
+        )
+        self.assertFalse(is_not_applied_error(error))
+
+
+class TestCallWithRetry(unittest.TestCase):
+    def setUp(self):
+        self.policy = RetryPolicy(max_attempts=3, base_delay=0)
+        self.breaker = CircuitBreaker(failure_threshold=5)
+        self.metrics = ResilienceMetrics()
+
+    def test_transient_error_then_success(self):
+        operation = _FlakyOperation(_sqlite_error('database is locked'))
+
+        result = call_with_retry(
+            operation, self.policy, self.breaker, self.metrics
+        )
+
+        self.assertEqual(result, 'ok')
+        self.assertEqual(operation.calls, 2)
+        self.assertEqual(self.metrics.attempts, 2)
+        self.assertEqual(self.metrics.retries, 1)
+        self.assertEqual(self.metrics.transient_errors, 1)
+        self.assertEqual(self.metrics.successes, 1)
+        self.assertEqual(self.metrics.failures, 0)
+        self.assertEqual(self.breaker.state, 'closed')
+        self.assertEqual(self.breaker.failure_count, 0)
+
+    def test_transient_error_exhausts_attempts(self):
+        operation = _FlakyOperation(*[_pg_error('08006')] * 3)
+
+        with self.assertRaises(OperationalError):
+            call_with_retry(operation, self.policy, self.breaker, self.metrics)
+
+        self.assertEqual(operation.calls, 3)
+        self.assertEqual(self.metrics.retries, 2)
+        self.assertEqual(self.metrics.failures, 1)
+
+    def test_permanent_error_is_not_retried(self):
+        error = ProgrammingError('SELCT 1', {}, _PgError('42601'))
+        operation = _FlakyOperation(error)
+
+        with self.assertRaises(ProgrammingError):
+            call_with_retry(operation, self.policy, self.breaker, self.metrics)
+
+        self.assertEqual(operation.calls, 1)
+        self.assertEqual(self.metrics.permanent_errors, 1)
+        self.assertEqual(self.metrics.retries, 0)
+        self.assertEqual(self.breaker.failure_count, 0)
+        self.assertEqual(self.breaker.state, 'closed')
+
+    def test_retry_if_blocks_retry(self):
+        operation = _FlakyOperation(_sqlite_error('database is locked'))
+
+        with self.assertRaises(OperationalError):
+            call_with_retry(
+                operation,
+                self.policy,
+                self.breaker,
+                self.metrics,
+                retry_if=lambda e: False,
+            )
+
+        self.assertEqual(operation.calls, 1)
+        self.assertEqual(self.breaker.failure_count, 1)
+
+    def test_on_retry_receives_last_error(self):
+        error = _sqlite_error('database is locked')
+        received = []
+
+        call_with_retry(
+            _FlakyOperation(error),
+            self.policy,
+            self.breaker,
+            self.metrics,
+            on_retry=received.append,
+        )
+
+        self.assertEqual(received, [error])
+
+    def test_open_circuit_rejects_calls(self):
+        breaker = CircuitBreaker(failure_threshold=2, reset_timeout=60)
+        operation = _FlakyOperation(*[_pg_error('08006')] * 3)
+
+        with self.assertRaises(OperationalError):
+            call_with_retry(operation, self.policy, breaker, self.metrics)
+        with self.assertRaises(CircuitBreakerOpenError):
+            call_with_retry(operation, self.policy, breaker, self.metrics)
+
+        self.assertEqual(operation.calls, 2)
+        self.assertEqual(self.metrics.rejected_by_circuit, 1)
+
+
+class TestCircuitBreaker(unittest.TestCase):
+    def test_open_half_open_and_close(self):
+        breaker = CircuitBreaker(failure_threshold=2, reset_timeout=0.05)
+
+        breaker.record_failure()
+        self.assertEqual(breaker.state, 'closed')
+        breaker.record_failure()
+        self.assertEqual(breaker.state, 'open')
+        self.assertFalse(breaker.allow_request())
+
+        time.sleep(0.06)
+        self.assertTrue(breaker.allow_request())
+        self.assertEqual(breaker.state, 'half_open')
+        self.assertFalse(breaker.allow_request())
+
+        breaker.record_success()
+        self.assertEqual(breaker.state, 'closed')
+        self.assertTrue(breaker.allow_request())
+        self.assertTrue(breaker.allow_request())
+
+    def test_half_open_probe_failure_reopens(self):
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.05)
+        breaker.record_failure()
+
+        time.sleep(0.06)
+        self.assertTrue(breaker.allow_request())
+        breaker.record_failure()
+
+        self.assertEqual(breaker.state, 'open')
+        self.assertFalse(breaker.allow_request())
+
+    def test_half_open_probe_released_by_permanent_error(self):
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.05)
+        breaker.record_failure()
+        time.sleep(0.06)
+        operation = _FlakyOperation(_sqlite_error('no such table: t'))
+
+        with self.assertRaises(OperationalError):
+            call_with_retry(
+                operation, RetryPolicy(), breaker, ResilienceMetrics()
+            )
+
+        self.assertEqual(breaker.state, 'half_open')
+        self.assertTrue(breaker.allow_request())
+
+
+class TestAsyncCallWithRetry(unittest.IsolatedAsyncioTestCase):
+    async def test_transient_error_then_success(self):
+        errors = [_pg_error('40001')]
+        metrics = ResilienceMetrics()
+
+        async def operation():
+            if errors:
+                raise errors.pop()
+            return 'ok'
+
+        result = await async_call_with_retry(
+            operation, RetryPolicy(base_delay=0), CircuitBreaker(), metrics
+        )
+
+        self.assertEqual(result, 'ok')
+        self.assertEqual(metrics.retries, 1)
+        self.assertEqual(metrics.successes, 1)
+
+    async def test_cancelled_probe_releases_half_open(self):
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0)
+        breaker.record_failure()
+
+        async def operation():
+            await asyncio.sleep(10)
+
+        task = asyncio.create_task(
+            async_call_with_retry(
+                operation, RetryPolicy(), breaker, ResilienceMetrics()
+            )
+        )
+        await asyncio.sleep(0)
+        task.cancel()
+        with self.assertRaises(asyncio.CancelledError):
+            await task
+
+        self.assertEqual(breaker.state, 'half_open')
+        self.assertTrue(breaker.allow_request())
+
+
+if __name__ == '__main__':
+    unittest.main()
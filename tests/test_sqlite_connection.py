@@ -0,0 +1,140 @@
+import os
+import sqlite3
+import tempfile
+import unittest
+from unittest import mock
+
+from sqlalchemy.engine import Connection
+from sqlalchemy.exc import DisconnectionError, OperationalError
+
+from pipelus.db.resilience import CircuitBreaker, RetryPolicy
+from pipelus.db.sqlite_connection import SyncSQLiteConnection
+
+
+def _locked_error() -> OperationalError:
+    return OperationalError(
+        'SELECT 1', {}, sqlite3.OperationalError('database is locked')
+    )
+
+
+def _invalidated_error() -> OperationalError:
+    return OperationalError(
+        'INSERT',
+        {},
+        sqlite3.OperationalError('disk I/O error'),
+        connection_invalidated=True,
+    )
+
+
+def _fail_first(method, error: Exception):
+    """Envolve o método para lançar `error` apenas na primeira chamada."""
+
+    def wrapper(self, *args, **kwargs):
+        wrapper.calls += 1
+        if wrapper.calls == 1:
+            raise error
+        return method(self, *args, **kwargs)
+
+    wrapper.calls = 0
+    return wrapper
+
+
+class TestSyncSQLiteConnection(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        path = os.path.join(self.tmp_dir.name, 'test.db')
+        self.db = SyncSQLiteConnection(
+            f'sqlite:///{path}',
+            retry_policy=RetryPolicy(max_attempts=3, base_delay=0),
+            circuit_breaker=CircuitBreaker(failure_threshold=2),
+        )
+        self.db.__enter__()
+        self.db.execute_modify('CREATE TABLE t (a INTEGER)')
+
+    def tearDown(self):
+        self.db.__exit__(None, None, None)
+        self.db.engine.dispose()
+        self.tmp_dir.cleanup()
+
+    def test_invalid_queries_do_not_open_circuit(self):
+        self.assertEqual(self.db.execute_query('SELCT 1'), [])
+        self.assertEqual(self.db.execute_query('SELECT * FROM nope'), [])
+
+        self.assertEqual(self.db.circuit_breaker.state, 'closed')
+        self.assertEqual(self.db.metrics.permanent_errors, 2)
+        self.assertEqual(self.db.metrics.retries, 0)
+        self.assertEqual(self.db.execute_query('SELECT 1 AS x'), [{'x': 1}])
+        self.assertTrue(self.db.execute_modify('INSERT INTO t VALUES (1)'))
+
+    def test_execute_query_returns_empty_after_final_failure(self):
+        with mock.patch.object(
+            self.db.connection, 'execute', side_effect=_locked_error()
+        ):
+            self.assertEqual(self.db.execute_query('SELECT * FROM t'), [])
+
+        self.assertEqual(self.db.metrics.retries, 1)
+        self.assertEqual(self.db.metrics.failures, 1)
+        self.assertEqual(self.db.circuit_breaker.state, 'open')
+
+    def test_locked_modify_is_retried(self):
+        execute = _fail_first(Connection.execute, _locked_error())
+        with mock.patch.object(Connection, 'execute', execute):
+            self.assertTrue(self.db.execute_modify('INSERT INTO t VALUES (1)'))
+
+        self.assertEqual(execute.calls, 2)
+        self.assertEqual(self.db.metrics.retries, 1)
+        self.assertEqual(self.db.execute_query('SELECT a FROM t'), [{'a': 1}])
+
+    def test_disconnect_after_send_is_not_retried(self):
+        execute = _fail_first(Connection.execute, _invalidated_error())
+        with mock.patch.object(Connection, 'execute', execute):
+            self.assertFalse(self.db.execute_modify('INSERT INTO t VALUES (1)'))
+
+        self.assertEqual(execute.calls, 1)
+        self.assertEqual(self.db.metrics.retries, 0)
+
+    def test_idempotent_modify_is_retried_after_disconnect(self):
+        execute = _fail_first(Connection.execute, _invalidated_error())
+        with mock.patch.object(Connection, 'execute', execute):
+            self.assertTrue(
+                self.db.execute_modify('DELETE FROM t', idempotent=True)
+            )
+
+        self.assertEqual(execute.calls, 2)
+        self.assertEqual(self.db.metrics.retries, 1)
+
+    def test_execute_modify_retries_failed_checkout(self):
+        real_connection = self.db.engine.connect()
+        with mock.patch.object(
+            self.db.engine,
+            'connect',
+            side_effect=[DisconnectionError('checkout'), real_connection],
+        ):
+            self.assertTrue(self.db.execute_modify('INSERT INTO t VALUES (1)'))
+
+        self.assertEqual(self.db.metrics.retries, 1)
+        self.assertEqual(self.db.execute_query('SELECT a FROM t'), [{'a': 1}])
+
+    def test_shared_circuit_breaker(self):
+        other = SyncSQLiteConnection(
+            self.db.connection_string,
+            circuit_breaker=self.db.circuit_breaker,
+        )
+
+        self.assertIs(other.circuit_breaker, self.db.circuit_breaker)
+        other.engine.dispose()
+
+
+class TestInMemorySQLiteConnection(unittest.TestCase):
+    def test_failed_query_keeps_in_memory_database(self):
+        with SyncSQLiteConnection('sqlite://') as db:
+            db.execute_modify('CREATE TABLE t (a INTEGER)')
+            db.execute_modify('INSERT INTO t VALUES (1)')
+
+            self.assertEqual(db.execute_query('SELECT * FROM nope'), [])
+            self.assertEqual(db.execute_query('SELECT a FROM t'), [{'a': 1}])
+        db.engine.dispose()
+
+
+if __name__ == '__main__':
+    unittest.main()